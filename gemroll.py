@@ -1,11 +1,16 @@
 import argparse
 import csv
 import datetime
+import heapq
 import ignition
+import io
 import itertools
+import operator
 import re
 import sys
-import urllib
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
 class Selector:
     class DateSelector:
@@ -16,8 +21,7 @@ class Selector:
             if len(sub.items) == 0:
                 return sub.errors
 
-            sub.items.sort(key=lambda x: x.date, reverse=True)
-            return filter(lambda x: x.date >= self.since, sub.items)
+            return itertools.takewhile(lambda x, since=self.since: x.date >= since, sub.items)
 
     class NumberSelector:
         def __init__(self, n):
@@ -27,7 +31,6 @@ class Selector:
             if len(sub.items) == 0:
                 return sub.errors
 
-            sub.items.sort(key=lambda x: x.date, reverse=True)
             return sub.items[:self.n]
 
     def __init__(self, args):
@@ -50,7 +53,7 @@ class Outputter:
         out.write(self.footer + "\n\n")
 
     def output(self, subscriptions):
-        with open(self.output_file, "w") as out:
+        with open(self.output_file, "w", buffering=1 << 16) as out:
             self.write_header(out)
             self._output(subscriptions, out)
             self.write_footer(out)
@@ -60,29 +63,32 @@ class Outputter:
 
 class ContinuousOutputter(Outputter):
     def _output(self, subscriptions, out):
-        items = [item for sub in subscriptions for item in self.selector.select(sub)]
-        items.sort(key=lambda x: x.entry_date(), reverse=True)
-        for item in items:
-            out.write(item.format() + f" [{item.subscription_name()}]\n")
+        runs = [self.selector.select(sub) for sub in subscriptions]
+        items = heapq.merge(*runs, key=operator.attrgetter("_sortkey"))
+        out.write("".join(f"{item.format()} [{item.subscription_name()}]\n" for item in items))
 
 class FeedOutputter(Outputter):
     def _output(self, subscriptions, out):
         for subscription in subscriptions:
-            out.write("## " + subscription.header + "\n")
-            for item in self.selector.select(subscription):
-                out.write(item.format() + "\n")
-            out.write("\n")
+            lines = [f"## {subscription.header}"]
+            lines.extend(item.format() for item in self.selector.select(subscription))
+            out.write("\n".join(lines) + "\n\n")
 
 class DateOutputter(Outputter):
     def _output(self, subscriptions, out):
-        items = [item for sub in subscriptions for item in self.selector.select(sub)]
-        items.sort(key=lambda x: x.entry_date(), reverse=True)
-        groups = itertools.groupby(items, key=lambda x: x.entry_date().date())
+        runs = [self.selector.select(sub) for sub in subscriptions]
+        items = heapq.merge(*runs, key=operator.attrgetter("_sortkey"))
+        groups = itertools.groupby(items, key=operator.attrgetter("_day"))
         for group in groups:
-            out.write("## " + group[0].isoformat() + "\n")
-            for item in group[1]:
-                out.write(item.format() + f" [{item.subscription_name()}]\n")
-            out.write("\n")
+            lines = [f"## {group[0].isoformat()}"]
+            lines.extend(f"{item.format()} [{item.subscription_name()}]" for item in group[1])
+            out.write("\n".join(lines) + "\n\n")
+
+def _sort_key(date):
+    if date.tzinfo:
+        date = (date - date.utcoffset()).replace(tzinfo=None)
+    seconds = date.toordinal() * 86400 + date.hour * 3600 + date.minute * 60 + date.second
+    return -(seconds * 1000000 + date.microsecond)
 
 class Item:
     def format(self):
@@ -95,25 +101,26 @@ class Item:
         return NotImplementedError("override me!")
 
 class FetchedItem:
-    def __init__(self, link_line, sub):
-        self.main_url = sub.url
+    __slots__ = ("url", "header", "date", "_day", "_sortkey", "subscription_header", "_formatted")
+
+    def __init__(self, link_line, sub, date):
         _, self.url, self.header = link_line.split(maxsplit=2)
-        self.date = datetime.datetime.strptime(self.header.split()[0], sub.date_format)
+        self.date = date
+        self._day = self.date.date()
+        self._sortkey = _sort_key(self.date)
         self.subscription_header = sub.header
-
-    def _absolute_link(self):
-        url = urllib.parse.urlparse(self.main_url)
         if self.url.startswith("gemini://"):
-            return self.url
-        if self.url.startswith("/"):
-            return f"{url.scheme}://{url.netloc}{self.url}"
-        if self.main_url.endswith("/"):
-            return self.main_url + self.url
-        before, _, after = self.main_url.rpartition("/")
-        return "{before}/{link}"
+            link = self.url
+        elif self.url.startswith("/"):
+            link = sub._origin + self.url
+        elif self.url.startswith("."):
+            link = ignition.url(self.url, sub.url)
+        else:
+            link = sub._url_dir + self.url
+        self._formatted = f"=> {link} {self.header.strip()}"
 
     def format(self):
-        return f"=> {self._absolute_link()} {self.header.strip()}"
+        return self._formatted
 
     def subscription_name(self):
         return self.subscription_header
@@ -122,10 +129,14 @@ class FetchedItem:
         return self.date
 
 class ErrorItem:
+    __slots__ = ("error", "url", "date", "_day", "_sortkey")
+
     def __init__(self, message, url):
         self.error = message
         self.url = url
         self.date = datetime.datetime(1900,1,1)
+        self._day = self.date.date()
+        self._sortkey = _sort_key(self.date)
 
     def format(self):
         return self.error
@@ -136,42 +147,97 @@ class ErrorItem:
     def entry_date(self):
         return self.date
 
+class LockedCertStore(ignition.CertStore):
+    def __init__(self, hosts_file):
+        super().__init__(hosts_file)
+        self._lock = threading.Lock()
+
+    def validate_tofu_or_add(self, hostname, cert):
+        with self._lock:
+            return super().validate_tofu_or_add(hostname, cert)
+
 class Subscription:
+    __slots__ = ("url", "header", "_origin", "_url_dir", "date_format", "_entry_re", "_iso", "verbose", "errors", "items")
+
+    _log_lock = threading.Lock()
+    _cert_store = LockedCertStore(ignition.DEFAULT_HOSTS_FILE)
+    _y_pattern = r"(?P<y>\d{4})"
+    _m_pattern = r"(?P<m>1[0-2]|0[1-9]|[1-9])"
+    _d_pattern = r"(?P<d>3[01]|[12]\d|0[1-9]|[1-9])"
+    _date_patterns = {
+        "%Y-%m-%d": f"{_y_pattern}-{_m_pattern}-{_d_pattern}",
+        "%Y/%m/%d": f"{_y_pattern}/{_m_pattern}/{_d_pattern}",
+        "%Y.%m.%d": f"{_y_pattern}\\.{_m_pattern}\\.{_d_pattern}",
+        "%d.%m.%Y": f"{_d_pattern}\\.{_m_pattern}\\.{_y_pattern}",
+        "%d/%m/%Y": f"{_d_pattern}/{_m_pattern}/{_y_pattern}",
+        "%m/%d/%Y": f"{_m_pattern}/{_d_pattern}/{_y_pattern}",
+    }
+    _entry_patterns = {
+        fmt: re.compile(r"=>\S*\s+\S+\s+(?P<date>" + pattern + r")(?!\S)")
+        for fmt, pattern in _date_patterns.items()
+    }
+
     def __init__(self, subcription_line, args):
-        r = csv.reader([subcription_line], delimiter=" ")
-        items = list(r)[0]
+        if '"' in subcription_line:
+            items = [f for f in next(csv.reader([subcription_line], delimiter=" ")) if f]
+        else:
+            items = subcription_line.split()
         self.url, self.header = items[1:3]
+        url = urllib.parse.urlparse(self.url)
+        self._origin = f"{url.scheme}://{url.netloc}"
+        self._url_dir = self._origin + url.path.rpartition("/")[0] + "/"
         if len(items) > 3:
             self.date_format = items[3]
         else:
             self.date_format = "%Y-%m-%d"
+        self._entry_re = self._entry_patterns.get(self.date_format)
+        self._iso = self.date_format == "%Y-%m-%d"
         self.verbose = args.verbose
         self.errors = []
         self.items = []
 
     def _log(self, text):
         if self.verbose:
-            print(text)
+            with self._log_lock:
+                print(text)
 
-    def _is_feed_entry(self, link_line):
+    def _date_from_match(self, m):
+        text = m["date"]
+        try:
+            if self._iso and len(text) == 10 and text.isascii():
+                return datetime.datetime.fromisoformat(text)
+            return datetime.datetime(int(m["y"]), int(m["m"]), int(m["d"]))
+        except ValueError:
+            return None
+
+    def _entry_date(self, link_line):
+        if self._entry_re is not None:
+            m = self._entry_re.match(link_line)
+            if m is None:
+                return None
+            return self._date_from_match(m)
         if not link_line.startswith("=>"):
-            return False
+            return None
         parts = link_line.split(maxsplit=3)
         if len(parts) < 3:
-            return False
+            return None
         try:
-            date = datetime.datetime.strptime(parts[2], self.date_format)
-            return True
+            return datetime.datetime.strptime(parts[2], self.date_format)
         except ValueError:
-            return False
+            return None
 
     def fetch(self):
         self._log(f"Reading {self.url}")
-        resp = ignition.request(self.url)
+        request = ignition.Request(self.url, cert_store=self._cert_store,
+                                   request_timeout=ignition.DEFAULT_REQUEST_TIMEOUT)
+        resp = request.send()
         if not resp.success():
             self._log(f"Failed to fetch {self.url}")
             self.errors.append(ErrorItem(f"Failed to fetch {self.url}", self.url))
-        self.items = [FetchedItem(x, self) for x in resp.data().split("\n") if self._is_feed_entry(x)]
+        lines = (x.rstrip("\n") for x in io.StringIO(resp.data()) if x.startswith("=>"))
+        entries = ((x, self._entry_date(x)) for x in lines)
+        self.items = [FetchedItem(x, self, date) for x, date in entries if date is not None]
+        self.items.sort(key=operator.attrgetter("_sortkey"))
 
 def create_logroll(args):
     if args.by_date:
@@ -180,9 +246,16 @@ def create_logroll(args):
         output = FeedOutputter(args)
     else:
         output = ContinuousOutputter(args)
-    sub_list = [Subscription(x, args) for x in open(args.input_file).readlines() if x.startswith("=>")]
-    for sub in sub_list:
-        sub.fetch()
+    sub_list = []
+    with ThreadPoolExecutor(max_workers=32) as ex, open(args.input_file) as f:
+        fetches = []
+        for line in f:
+            if line.startswith("=>"):
+                sub = Subscription(line, args)
+                sub_list.append(sub)
+                fetches.append(ex.submit(sub.fetch))
+        for fetch in fetches:
+            fetch.result()
     output.output(sub_list)
 
 def get_parser():